@@ -1,14 +1,14 @@
 import json
 import logging
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime
+from pathlib import Path
 
-import boto3
-import pypugjs
 import sentry_sdk
 from authlib.integrations.starlette_client import OAuth
-from botocore.exceptions import ClientError
 from dotenv import load_dotenv
+from jinja2 import Environment, FileSystemLoader
 from sentry_sdk.integrations.aws_lambda import AwsLambdaIntegration
 from sentry_sdk.integrations.starlette import StarletteIntegration
 from starlette.applications import Starlette
@@ -34,6 +34,10 @@ def get_secrets_from_aws():
     if not secret_name:
         return {}
 
+    # boto3 is slow to import, so only load it when Secrets Manager is configured
+    import boto3
+    from botocore.exceptions import ClientError
+
     try:
         secrets_client = boto3.client("secretsmanager")
         response = secrets_client.get_secret_value(SecretId=secret_name)
@@ -44,12 +48,34 @@ def get_secrets_from_aws():
 
 
 # Determine the application directory (e.g., src/food-diary)
-APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = Path(__file__).resolve().parent
 # Determine the project root directory (parent of src)
-PROJECT_ROOT = os.path.abspath(os.path.join(APP_DIR, os.pardir, os.pardir))
+PROJECT_ROOT = APP_DIR.parents[1]
+
+TEMPLATES_DIR = PROJECT_ROOT / "templates"
+STATIC_DIR = PROJECT_ROOT / "static"
+SERVICE_WORKER_PATH = STATIC_DIR / "service-worker.js"
+
+# Pug templates are compiled to Jinja and cached. On Lambda the cache is never checked for
+# changes; elsewhere edited templates are picked up, as `uvicorn --reload` only watches .py files
+jinja_env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    extensions=["pypugjs.ext.jinja.PyPugJSExtension"],
+    auto_reload=os.getenv("AWS_LAMBDA_RUNTIME") is None,
+    cache_size=400,
+)
+
+
+def compile_templates():
+    """Compile every Pug template into the Jinja cache."""
+    for template_name in jinja_env.list_templates(extensions=["pug"]):
+        jinja_env.get_template(template_name)
+
 
-TEMPLATES_DIR = os.path.join(PROJECT_ROOT, "templates")
-STATIC_DIR = os.path.join(PROJECT_ROOT, "static")
+# Mangum runs the app with lifespan="off", so on Lambda compile templates at import instead.
+# That happens during the function's init phase rather than on its first request.
+if os.getenv("AWS_LAMBDA_RUNTIME"):
+    compile_templates()
 
 # AWS configuration
 STATIC_BUCKET = os.getenv("STATIC_BUCKET")
@@ -57,9 +83,6 @@ CLOUDFRONT_DOMAIN = os.getenv("CLOUDFRONT_DOMAIN")
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 API_STAGE_PATH = os.getenv("API_STAGE_PATH", "")
 
-# Ensure the static directory exists, as Starlette expects it
-os.makedirs(STATIC_DIR, exist_ok=True)
-
 # OAuth Configuration - try Secrets Manager first, fall back to environment variables
 secrets = get_secrets_from_aws()
 SECRET_KEY = secrets.get("SECRET_KEY") or os.getenv(
@@ -157,47 +180,8 @@ def render_pug_template(template_name: str, context: dict = None) -> HTMLRespons
     """
     Renders a Pug template to an HTMLResponse.
     """
-    if context is None:
-        context = {}
-
-    template_path = os.path.join(TEMPLATES_DIR, template_name)
-
-    # pypugjs.simple_convert expects the Pug source code as a string
-    with open(template_path, "r") as f:
-        pug_source = f.read()
-
-    # Replace template variables in the pug source for JavaScript injection
-    import json
-
-    # Prepare variables for JavaScript section and HTML attributes
-    js_replacements = {}
-    for key, value in context.items():
-        if key == "is_authenticated":
-            js_replacements[f"#{{ {key} }}"] = str(value).lower()
-            js_replacements[f"#{{{key}}}"] = str(value).lower()
-        elif key == "user":
-            # Convert user dict to JSON for JavaScript, or null if None
-            json_value = json.dumps(value) if value else "null"
-            js_replacements[f"#{{ {key} }}"] = json_value
-            js_replacements[f"#{{{key}}}"] = json_value
-        elif key == "api_stage_path":
-            # Pass stage path as string for JavaScript (with quotes)
-            js_replacements[f"#{{ {key} }}"] = f'"{value}"'
-            # Pass stage path as plain value for HTML attributes (without quotes)
-            js_replacements[f"#{{{key}}}"] = str(value)
-
-    # Apply JavaScript replacements
-    for pattern, replacement in js_replacements.items():
-        pug_source = pug_source.replace(pattern, replacement)
-
-    # Compile Pug with context variables for conditionals
-    try:
-        html_content = pypugjs.simple_convert(pug_source, **context)
-    except Exception:
-        # Fallback to simple conversion if context passing fails
-        html_content = pypugjs.simple_convert(pug_source)
-
-    return HTMLResponse(html_content)
+    template = jinja_env.get_template(template_name)
+    return HTMLResponse(template.render(context or {}))
 
 
 async def homepage(request):
@@ -220,9 +204,8 @@ async def service_worker(request):
     Serves the service worker file with the correct MIME type.
     Service workers need to be served from the root to have the correct scope.
     """
-    service_worker_path = os.path.join(STATIC_DIR, "service-worker.js")
     return FileResponse(
-        service_worker_path,
+        SERVICE_WORKER_PATH,
         media_type="application/javascript",
         headers={
             "Service-Worker-Allowed": "/",
@@ -312,24 +295,25 @@ async def get_entries(request: Request):
     return JSONResponse(entries)
 
 
+def parse_entry_data(data: dict) -> dict:
+    """Pull the entry fields out of a request body, filling in defaults."""
+    timestamp = data.get("timestamp", datetime.now().isoformat())
+    return {
+        "timestamp": timestamp,
+        "event_datetime": data.get("event_datetime", timestamp),
+        "text": data.get("text", ""),
+        "photo": data.get("photo"),
+    }
+
+
 @require_auth
 async def create_entry(request: Request):
     """Create a new entry in S3 storage for the authenticated user."""
     try:
         user_id = request.state.user["id"]
         data = await request.json()
-        timestamp = data.get("timestamp", datetime.now().isoformat())
-        event_datetime = data.get("event_datetime", timestamp)
-        text = data.get("text", "")
-        photo = data.get("photo")
 
-        entry = get_storage().create_entry(
-            user_id=user_id,
-            timestamp=timestamp,
-            event_datetime=event_datetime,
-            text=text,
-            photo=photo,
-        )
+        entry = get_storage().create_entry(user_id=user_id, **parse_entry_data(data))
 
         return JSONResponse(entry, status_code=201)
 
@@ -337,6 +321,25 @@ async def create_entry(request: Request):
         return JSONResponse({"error": str(e)}, status_code=400)
 
 
+@require_auth
+async def create_entries_bulk(request: Request):
+    """Create several entries in S3 storage for the authenticated user in one write."""
+    try:
+        user_id = request.state.user["id"]
+        data = await request.json()
+        if not isinstance(data, list):
+            return JSONResponse({"error": "Expected a list of entries"}, status_code=400)
+
+        entries = get_storage().create_entries(
+            user_id=user_id, entries=[parse_entry_data(item) for item in data]
+        )
+
+        return JSONResponse(entries, status_code=201)
+
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+
 @require_auth
 async def update_entry(request: Request):
     """Update an existing entry for the authenticated user."""
@@ -392,14 +395,48 @@ routes = [
     # Protected API routes
     Route("/api/entries", get_entries, methods=["GET"]),
     Route("/api/entries", create_entry, methods=["POST"]),
+    Route("/api/entries/bulk", create_entries_bulk, methods=["POST"]),
     Route("/api/entries/{entry_id:int}", update_entry, methods=["PUT"]),
     Route("/api/entries/{entry_id:int}", delete_entry, methods=["DELETE"]),
 ]
 
 # Add static file serving - serve files directly from Lambda
-routes.append(Mount("/static", app=StaticFiles(directory=STATIC_DIR), name="static"))
+# The directory is created at startup, so don't check for it at import time
+routes.append(
+    Mount("/static", app=StaticFiles(directory=STATIC_DIR, check_dir=False), name="static")
+)
 
 # Session middleware for authentication
 middleware = [Middleware(SessionMiddleware, secret_key=SECRET_KEY)]
 
-app = Starlette(debug=True, routes=routes, middleware=middleware)
+
+@asynccontextmanager
+async def lifespan(app):
+    """One-off setup when the server starts, rather than on every import."""
+    # Ensure the static directory exists, as Starlette expects it
+    STATIC_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Compile templates up front so the first request doesn't pay for it. This doesn't run
+    # on Lambda, where templates are compiled at import instead
+    compile_templates()
+
+    yield
+
+
+app = Starlette(debug=True, routes=routes, middleware=middleware, lifespan=lifespan)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Each worker is a separate process with its own template cache and storage client.
+    # 2n+1 workers keeps every core busy while some workers wait on S3.
+    # The loop and HTTP parser are left to uvicorn, which picks uvloop and httptools when
+    # uvicorn[standard] installed them, and falls back where they aren't available.
+    uvicorn.run(
+        "food_diary.main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1)),
+        log_level="info",
+    )
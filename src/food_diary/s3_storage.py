@@ -7,19 +7,28 @@ import json
 import logging
 import os
 from datetime import datetime
-from typing import Any, Dict, List, Optional
-
-import boto3
-from botocore.config import Config
-from botocore.exceptions import ClientError
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Newline-delimited JSON with one profile per line, so users can be found in one request
+USERS_MANIFEST_KEY = "indexes/users_manifest.ndjson"
+
+# How many times to re-read and rewrite the manifest when another login changed it first
+MANIFEST_WRITE_ATTEMPTS = 5
+
 
 class S3Storage:
     """S3-based storage that replaces database functionality."""
 
     def __init__(self):
+        # boto3 is slow to import, so only load it once S3 storage is actually used
+        import boto3
+        from botocore.config import Config
+        from botocore.exceptions import ClientError
+
+        self._ClientError = ClientError
+
         self.bucket_name = os.getenv("DATA_BUCKET")
         if not self.bucket_name:
             raise ValueError("DATA_BUCKET environment variable not set")
@@ -49,7 +58,7 @@ class S3Storage:
         try:
             response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
             return json.loads(response["Body"].read().decode("utf-8"))
-        except ClientError as e:
+        except self._ClientError as e:
             if e.response["Error"]["Code"] == "NoSuchKey":
                 return None
             logger.error(f"Error reading {key} from S3: {e}")
@@ -71,7 +80,7 @@ class S3Storage:
                 **extra_args,
             )
             return True
-        except ClientError as e:
+        except self._ClientError as e:
             if e.response["Error"]["Code"] == "PreconditionFailed":
                 # Conditional write failed (object already exists)
                 return False
@@ -108,6 +117,7 @@ class S3Storage:
             }
 
             self._write_json_to_s3(profile_key, profile_data)
+            self._update_users_manifest(profile_data)
             logger.info(f"Updated user {user_id} (github_id: {github_id})")
             return profile_data
         else:
@@ -130,7 +140,8 @@ class S3Storage:
             if self._write_json_to_s3(profile_key, profile_data, if_none_match=True):
                 # Also initialize empty entries file
                 entries_key = self._get_user_entries_key(user_id)
-                self._write_json_to_s3(entries_key, {"entries": []})
+                self._write_json_to_s3(entries_key, {"next_id": 1, "entries": []})
+                self._update_users_manifest(profile_data)
 
                 logger.info(f"Created new user {user_id} (github_id: {github_id})")
                 return profile_data
@@ -139,8 +150,96 @@ class S3Storage:
                 logger.warning(f"Race condition creating user {user_id}, retrying...")
                 return self.create_or_update_user(github_id, username, name, email, avatar_url)
 
+    def _read_users_manifest(self) -> Tuple[Dict[int, Dict[str, Any]], Optional[str]]:
+        """Read the users manifest, keyed by GitHub ID, along with its ETag."""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=USERS_MANIFEST_KEY)
+        except self._ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchKey":
+                return {}, None
+            logger.error(f"Error reading {USERS_MANIFEST_KEY} from S3: {e}")
+            raise
+
+        profiles = {}
+        for line in response["Body"].read().decode("utf-8").splitlines():
+            if line:
+                profile = json.loads(line)
+                profiles[profile["github_id"]] = profile
+        return profiles, response["ETag"]
+
+    def _write_users_manifest(
+        self, profiles: Dict[int, Dict[str, Any]], etag: Optional[str]
+    ) -> bool:
+        """Write the users manifest, only if it hasn't changed since it was read."""
+        # Without the condition, two logins at once could each drop the other's profile
+        condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=USERS_MANIFEST_KEY,
+                Body="".join(json.dumps(p) + "\n" for p in profiles.values()),
+                ContentType="application/x-ndjson",
+                **condition,
+            )
+            return True
+        except self._ClientError as e:
+            if e.response["Error"]["Code"] in ("PreconditionFailed", "ConditionalRequestConflict"):
+                return False
+            raise
+
+    def _update_users_manifest(self, profile: Dict[str, Any]) -> None:
+        """Add or replace a user's profile in the users manifest."""
+        # The manifest is only an index, so failing to update it must not fail the login;
+        # users missing from it are still found by scanning their profiles
+        try:
+            for _ in range(MANIFEST_WRITE_ATTEMPTS):
+                profiles, etag = self._read_users_manifest()
+                profiles[profile["github_id"]] = profile
+                if self._write_users_manifest(profiles, etag):
+                    return
+            logger.warning(f"Users manifest kept changing, gave up adding user {profile['id']}")
+        except self._ClientError as e:
+            logger.error(f"Error updating {USERS_MANIFEST_KEY} in S3: {e}")
+
+    def _find_user_in_manifest(self, github_id: int) -> Optional[Dict[str, Any]]:
+        """Find user by GitHub ID in the users manifest using S3 Select."""
+        try:
+            response = self.s3_client.select_object_content(
+                Bucket=self.bucket_name,
+                Key=USERS_MANIFEST_KEY,
+                ExpressionType="SQL",
+                Expression=f"SELECT * FROM s3object s WHERE s.github_id = {int(github_id)} LIMIT 1",
+                InputSerialization={"JSON": {"Type": "LINES"}},
+                OutputSerialization={"JSON": {"RecordDelimiter": "\n"}},
+            )
+        except self._ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchKey":
+                return None
+            # S3 Select isn't available everywhere (e.g. LocalStack), so read the manifest instead
+            logger.info(f"S3 Select unavailable ({e}), reading users manifest directly")
+            profiles, _ = self._read_users_manifest()
+            return profiles.get(github_id)
+
+        # Records can be split across events, even mid-character, so decode once joined
+        records = b"".join(
+            event["Records"]["Payload"] for event in response["Payload"] if "Records" in event
+        ).decode("utf-8")
+        for line in records.splitlines():
+            if line:
+                return json.loads(line)
+        return None
+
     def get_user_by_github_id(self, github_id: int) -> Optional[Dict[str, Any]]:
-        """Find user by GitHub ID by scanning user profiles."""
+        """Find user by GitHub ID, falling back to scanning user profiles."""
+        try:
+            user = self._find_user_in_manifest(github_id)
+        except self._ClientError as e:
+            logger.error(f"Error reading users manifest, scanning profiles instead: {e}")
+            user = None
+        if user:
+            return user
+
+        # Users created before the manifest existed are only found by scanning
         try:
             # List all user profile objects
             response = self.s3_client.list_objects_v2(
@@ -159,7 +258,7 @@ class S3Storage:
                     continue
 
             return None
-        except ClientError as e:
+        except self._ClientError as e:
             logger.error(f"Error searching for user with github_id {github_id}: {e}")
             return None
 
@@ -185,7 +284,7 @@ class S3Storage:
                     continue
 
             return max_id + 1
-        except ClientError as e:
+        except self._ClientError as e:
             logger.error(f"Error getting next user ID: {e}")
             # Fallback to timestamp-based ID
             return int(datetime.now().timestamp())
@@ -212,30 +311,51 @@ class S3Storage:
         photo: str = None,
     ) -> Dict[str, Any]:
         """Create a new entry for a user."""
-        entries_key = self._get_user_entries_key(user_id)
-        entries_data = self._read_json_from_s3(entries_key) or {"entries": []}
-
-        # Get next entry ID
-        max_id = 0
-        for entry in entries_data["entries"]:
-            max_id = max(max_id, entry.get("id", 0))
-
-        new_entry = {
-            "id": max_id + 1,
-            "user_id": user_id,
+        entry = {
             "timestamp": timestamp,
-            "event_datetime": event_datetime or timestamp,
+            "event_datetime": event_datetime,
             "text": text,
             "photo": photo,
-            "synced": True,
-            "created_at": datetime.now().isoformat(),
         }
+        return self.create_entries(user_id, [entry])[0]
+
+    def create_entries(self, user_id: int, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several entries for a user with a single read and write of the entries file."""
+        entries_key = self._get_user_entries_key(user_id)
+        entries_data = self._read_json_from_s3(entries_key) or {"next_id": 1, "entries": []}
+
+        new_entries = []
+        for entry in entries:
+            # Get next entry ID from the stored counter
+            new_id = self._get_next_entry_id(entries_data)
+            entries_data["next_id"] = new_id + 1
+
+            new_entry = {
+                "id": new_id,
+                "user_id": user_id,
+                "timestamp": entry["timestamp"],
+                "event_datetime": entry.get("event_datetime") or entry["timestamp"],
+                "text": entry.get("text", ""),
+                "photo": entry.get("photo"),
+                "synced": True,
+                "created_at": datetime.now().isoformat(),
+            }
+
+            entries_data["entries"].append(new_entry)
+            new_entries.append(new_entry)
 
-        entries_data["entries"].append(new_entry)
         self._write_json_to_s3(entries_key, entries_data)
 
-        logger.info(f"Created entry {new_entry['id']} for user {user_id}")
-        return new_entry
+        logger.info(f"Created {len(new_entries)} entries for user {user_id}")
+        return new_entries
+
+    def _get_next_entry_id(self, entries_data: Dict) -> int:
+        """Get next entry ID from the counter stored alongside the entries."""
+        if "next_id" in entries_data:
+            return entries_data["next_id"]
+
+        # Entries files written before the counter existed need one scan to seed it
+        return max((entry.get("id", 0) for entry in entries_data["entries"]), default=0) + 1
 
     def update_entry(
         self,
@@ -56,11 +56,18 @@ def main():
     """Generate all icon sizes."""
     print("Generating placeholder icons for Chompix PWA...")
 
+    # Render the glyph once at the largest size and downscale for the rest
+    largest = max(SIZES)
+    master = create_icon(largest)
+
     for size in SIZES:
         filename = f"icon-{size}x{size}.png"
         print(f"Creating {filename}...")
 
-        img = create_icon(size)
+        if size == largest:
+            img = master
+        else:
+            img = master.resize((size, size), Image.LANCZOS)
         img.save(filename)
 
     print("\nDone! Icons generated:")
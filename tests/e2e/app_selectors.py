@@ -0,0 +1,10 @@
+"""Selectors for the parts of the app the E2E tests use, shared by the fixtures and tests."""
+
+# Set on <body> by the app's x-init once Alpine.js has started
+ALPINE_READY_SEL = "body[data-alpine-ready='1']"
+LOGIN_BUTTON_SEL = "button:has-text('Sign in with GitHub')"
+NEW_ENTRY_TAB_SEL = "button.nav-tab:has-text('New Entry')"
+HISTORY_TAB_SEL = "button.nav-tab:has-text('History')"
+NOTE_SEL = "textarea#note"
+SAVE_SEL = "button.save-button"
+ENTRY_TEXT_SEL = ".entry-text"
@@ -0,0 +1,155 @@
+import os
+
+import pytest
+from app_selectors import ALPINE_READY_SEL, LOGIN_BUTTON_SEL, NEW_ENTRY_TAB_SEL
+from playwright.sync_api import Error, expect, sync_playwright
+
+# Set to a directory to record Playwright traces; they are only kept for failing tests
+TRACE_DIR = os.getenv("E2E_TRACE_DIR")
+
+# Skip Chromium features the tests don't need, so the browser starts faster and uses less memory
+BROWSER_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+]
+
+# Running Chromium in a single process starts faster still, but isn't stable everywhere
+if os.getenv("E2E_SINGLE_PROCESS"):
+    BROWSER_ARGS.append("--single-process")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Keep each phase's report on the test item so fixtures can tell if it failed"""
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
+    # Only gather page diagnostics when a test fails, so passing tests don't pay for them
+    if report.when == "call" and report.failed:
+        page = item.funcargs.get("page") or item.funcargs.get("authed_page")
+        if page is not None and not page.is_closed():
+            try:
+                text = page.locator("body").inner_text(timeout=1000)[:500]
+            except Error as e:
+                text = f"<unavailable: {e}>"
+            report.sections.append(("Page", f"Current URL: {page.url}\nPage text snippet: {text}"))
+
+
+@pytest.fixture(scope="session")
+def base_url():
+    """URL of the running app under test"""
+    return os.getenv("BASE_URL", "https://food-diary-nginx")
+
+
+@pytest.fixture(scope="session")
+def playwright_instance():
+    """Start Playwright once for the whole test session"""
+    with sync_playwright() as p:
+        yield p
+
+
+@pytest.fixture(scope="session")
+def browser(playwright_instance):
+    """Launch one browser per session (so one per xdist worker); tests create their own contexts"""
+    browser = playwright_instance.chromium.launch(args=BROWSER_ARGS)
+    yield browser
+    browser.close()
+
+
+def _authenticate(page):
+    """Helper function to authenticate a user"""
+    page.goto("/", wait_until="domcontentloaded", timeout=30000)
+
+    # Wait for Alpine.js to load and initialize
+    page.locator(ALPINE_READY_SEL).wait_for(state="attached", timeout=10000)
+
+    # Look for login button
+    login_button = page.locator(LOGIN_BUTTON_SEL)
+    if login_button.is_visible():
+        # Click and wait for navigation
+        with page.expect_navigation():
+            login_button.click()
+
+        # Check if we went to OAuth provider or if there was an error
+        if "chrome-error" in page.url:
+            raise AssertionError("OAuth redirect failed - check OAuth configuration")
+
+        # Wait for the app to fully load after authentication
+        page.locator(ALPINE_READY_SEL).wait_for(state="attached", timeout=10000)
+
+    # Verify authentication worked, waiting for the main app to appear
+    new_entry_tab = page.locator(NEW_ENTRY_TAB_SEL)
+    try:
+        expect(new_entry_tab).to_be_visible()
+    except AssertionError as e:
+        raise AssertionError("Authentication failed - main app not visible") from e
+
+
+@pytest.fixture(scope="session")
+def auth_state(browser, base_url, tmp_path_factory):
+    """Log in once and save the session cookies for authenticated tests"""
+    context = browser.new_context(ignore_https_errors=True, base_url=base_url)
+    page = context.new_page()
+
+    try:
+        _authenticate(page)
+        state_path = tmp_path_factory.mktemp("auth") / "state.json"
+        context.storage_state(path=state_path)
+        return state_path
+    finally:
+        context.close()
+
+
+def _new_context(browser, base_url, request, **kwargs):
+    """Open a context on the app without video recording, tracing only if asked to"""
+    context = browser.new_context(
+        ignore_https_errors=True, base_url=base_url, record_video_dir=None, **kwargs
+    )
+    if TRACE_DIR:
+        context.tracing.start(screenshots=True, snapshots=True)
+
+    yield context
+
+    if TRACE_DIR:
+        rep_call = getattr(request.node, "rep_call", None)
+        if rep_call is not None and rep_call.failed:
+            context.tracing.stop(path=os.path.join(TRACE_DIR, f"{request.node.name}.zip"))
+        else:
+            context.tracing.stop()
+    context.close()
+
+
+# Each test gets its own context, so no cookies or IndexedDB data carry over between tests.
+# Deleting FoodDiaryDB from a shared context isn't reliable: the app never closes its
+# IndexedDB connections, so the delete stays blocked until its pages are gone.
+@pytest.fixture
+def context(browser, base_url, request):
+    """Browser context that starts out logged out"""
+    yield from _new_context(browser, base_url, request)
+
+
+@pytest.fixture
+def page(context):
+    """Page that starts out logged out"""
+    return context.new_page()
+
+
+@pytest.fixture
+def authed_context(browser, base_url, auth_state, request):
+    """Browser context that starts out logged in"""
+    yield from _new_context(browser, base_url, request, storage_state=auth_state)
+
+
+@pytest.fixture
+def authed_page(authed_context):
+    """Page that is logged in and showing the app, without going through OAuth"""
+    page = authed_context.new_page()
+    page.goto("/", wait_until="domcontentloaded", timeout=30000)
+    return page
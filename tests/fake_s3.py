@@ -0,0 +1,100 @@
+"""
+In-memory stand-in for the boto3 S3 client.
+Covers only the calls S3Storage makes, including conditional writes.
+"""
+
+import hashlib
+import io
+import json
+import re
+
+from botocore.exceptions import ClientError
+
+from food_diary.s3_storage import S3Storage
+
+
+def client_error(code: str, operation: str) -> ClientError:
+    """Build a ClientError shaped like the ones boto3 raises."""
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class FakeS3Client:
+    """S3 client that keeps objects in a dict, keyed by object key."""
+
+    def __init__(self):
+        self.objects = {}
+        # Like LocalStack, S3 Select is unsupported unless a test turns it on
+        self.select_supported = False
+        # Bytes per Records event in a Select response, so records can be split across events
+        self.select_chunk_size = 1024
+
+    @staticmethod
+    def _etag(body: bytes) -> str:
+        return f'"{hashlib.md5(body).hexdigest()}"'
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise client_error("NoSuchKey", "GetObject")
+        body = self.objects[Key]
+        return {"Body": io.BytesIO(body), "ETag": self._etag(body)}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, IfMatch=None, IfNoneMatch=None):
+        if IfNoneMatch == "*" and Key in self.objects:
+            raise client_error("PreconditionFailed", "PutObject")
+        if IfMatch is not None:
+            if Key not in self.objects:
+                raise client_error("NoSuchKey", "PutObject")
+            if self._etag(self.objects[Key]) != IfMatch:
+                raise client_error("PreconditionFailed", "PutObject")
+
+        body = Body.encode("utf-8") if isinstance(Body, str) else Body
+        self.objects[Key] = body
+        return {"ETag": self._etag(body)}
+
+    def list_objects_v2(self, Bucket, Prefix="", Delimiter=None):
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        if not Delimiter:
+            return {"Contents": [{"Key": key} for key in keys]}
+
+        prefixes = sorted(
+            {
+                Prefix + key[len(Prefix) :].split(Delimiter)[0] + Delimiter
+                for key in keys
+                if Delimiter in key[len(Prefix) :]
+            }
+        )
+        return {"CommonPrefixes": [{"Prefix": prefix} for prefix in prefixes]}
+
+    def select_object_content(self, Bucket, Key, Expression, **kwargs):
+        if not self.select_supported:
+            raise client_error("NotImplemented", "SelectObjectContent")
+        if Key not in self.objects:
+            raise client_error("NoSuchKey", "SelectObjectContent")
+
+        # Only the query S3Storage makes is understood: NDJSON lines matching a github_id
+        github_id = int(re.search(r"s\.github_id = (\d+)", Expression).group(1))
+        records = [
+            json.loads(line) for line in self.objects[Key].decode("utf-8").splitlines() if line
+        ]
+        matches = [record for record in records if record["github_id"] == github_id]
+        # S3 Select writes its own JSON, with non-ASCII characters as raw UTF-8
+        payload = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in matches[:1]
+        ).encode("utf-8")
+
+        size = self.select_chunk_size
+        events = [
+            {"Records": {"Payload": payload[start : start + size]}}
+            for start in range(0, len(payload), size)
+        ]
+        events.append({"End": {}})
+        return {"Payload": events}
+
+
+def make_fake_storage(monkeypatch) -> S3Storage:
+    """Build an S3Storage whose client is a FakeS3Client, using monkeypatch for its settings."""
+    monkeypatch.setenv("DATA_BUCKET", "test-bucket")
+    monkeypatch.delenv("AWS_ENDPOINT_URL", raising=False)
+    storage = S3Storage()
+    storage.s3_client = FakeS3Client()
+    return storage
@@ -1,73 +1,36 @@
-import os
-import sqlite3
-import tempfile
-
 import pytest
+from fake_s3 import make_fake_storage
 from starlette.testclient import TestClient
 
 from food_diary.main import (
     app,
 )  # Assuming your app instance is in src/food-diary/main.py
 
-# Use a test database
-TEST_DB_PATH = tempfile.mktemp(suffix=".db")
+
+@pytest.fixture(scope="session")
+def storage():
+    """Point the app at S3 storage backed by an in-memory bucket, once for the session."""
+    with pytest.MonkeyPatch.context() as mp:
+        storage = make_fake_storage(mp)
+        mp.setattr("food_diary.main.get_storage", lambda: storage)
+
+        yield storage
 
 
 @pytest.fixture(autouse=True)
-def setup_test_db(monkeypatch):
-    """Set up a clean test database for each test."""
-    # Patch the DB_PATH to use test database
-    monkeypatch.setattr("food_diary.main.DB_PATH", TEST_DB_PATH)
-
-    # Initialize test database with full schema
-    conn = sqlite3.connect(TEST_DB_PATH)
-    cursor = conn.cursor()
-
-    # Create users table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            github_id INTEGER UNIQUE NOT NULL,
-            username TEXT NOT NULL,
-            name TEXT,
-            email TEXT,
-            avatar_url TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    # Create entries table with user_id and event_datetime
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS entries (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            timestamp TEXT NOT NULL,
-            event_datetime TEXT,
-            text TEXT,
-            photo TEXT,
-            synced BOOLEAN DEFAULT FALSE,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    """)
-
-    # Create a test user
-    cursor.execute("""
-        INSERT INTO users (github_id, username, name, email)
-        VALUES (12345, 'testuser', 'Test User', 'test@example.com')
-    """)
-
-    conn.commit()
-    conn.close()
-
-    yield
-
-    # Clean up test database after each test
-    if os.path.exists(TEST_DB_PATH):
-        os.unlink(TEST_DB_PATH)
-
-
-client = TestClient(app)
+def reset_storage(storage):
+    """Empty the bucket left by the previous test and seed the test user."""
+    storage.s3_client.objects.clear()
+    storage.create_or_update_user(
+        github_id=12345, username="testuser", name="Test User", email="test@example.com"
+    )
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Test client shared by the whole session, so the app's lifespan only runs once."""
+    with TestClient(app) as client:
+        yield client
 
 
 @pytest.fixture
@@ -87,18 +50,26 @@ def mock_auth(monkeypatch):
     monkeypatch.setattr("food_diary.main.get_current_user", mock_get_current_user)
 
 
-def test_homepage_loads_successfully():
+@pytest.fixture
+def created_entry(client, mock_auth, request):
+    """Create an entry from the test's parametrized payload via POST /api/entries."""
+    response = client.post("/api/entries", json=request.param)
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_homepage_loads_successfully(client):
     """
     Tests if the homepage (/) loads correctly, returns a 200 OK status,
     and contains expected content.
     """
     response = client.get("/")
     assert response.status_code == 200
-    assert "Food Diary Entry" in response.text
-    assert "<title>Food Diary Entry</title>" in response.text
+    assert "Chompix" in response.text
+    assert "<title>Chompix - Smart Food Diary</title>" in response.text
 
 
-def test_homepage_includes_app_js():
+def test_homepage_includes_app_js(client):
     """
     Tests if the homepage (/) includes the static/app.js script.
     """
@@ -107,7 +78,7 @@ def test_homepage_includes_app_js():
     assert 'src="/static/app.js"' in response.text
 
 
-def test_api_get_entries_empty(mock_auth):
+def test_api_get_entries_empty(client, mock_auth):
     """
     Tests the GET /api/entries endpoint returns empty list initially.
     """
@@ -116,7 +87,7 @@ def test_api_get_entries_empty(mock_auth):
     assert response.json() == []
 
 
-def test_api_create_entry(mock_auth):
+def test_api_create_entry(client, mock_auth):
     """
     Tests creating a new entry via POST /api/entries.
     """
@@ -132,21 +103,39 @@ def test_api_create_entry(mock_auth):
     assert "id" in created_entry
 
 
-def test_api_get_entries_with_data(mock_auth):
+def test_api_create_entries_bulk(client, mock_auth):
     """
-    Tests the GET /api/entries endpoint returns created entries.
+    Tests creating several entries at once via POST /api/entries/bulk.
     """
-    # First create an entry
-    entry_data = {
-        "timestamp": "2023-12-07T13:00:00Z",
-        "text": "Test dinner entry",
-        "photo": "data:image/jpeg;base64,/9j/4AAQSkZJRgABAQEAYABgAAD/",
-    }
+    entries_data = [
+        {"timestamp": "2023-12-07T08:00:00Z", "text": "Bulk breakfast", "photo": None},
+        {"timestamp": "2023-12-07T10:00:00Z", "text": "Bulk snack", "photo": None},
+    ]
 
-    create_response = client.post("/api/entries", json=entry_data)
-    assert create_response.status_code == 201
+    response = client.post("/api/entries/bulk", json=entries_data)
+    assert response.status_code == 201
+
+    created_entries = response.json()
+    assert [entry["text"] for entry in created_entries] == ["Bulk breakfast", "Bulk snack"]
+    assert len({entry["id"] for entry in created_entries}) == 2
+    assert all(entry["synced"] is True for entry in created_entries)
 
-    # Now get all entries
+
+@pytest.mark.parametrize(
+    "created_entry",
+    [
+        {
+            "timestamp": "2023-12-07T13:00:00Z",
+            "text": "Test dinner entry",
+            "photo": "data:image/jpeg;base64,/9j/4AAQSkZJRgABAQEAYABgAAD/",
+        },
+    ],
+    indirect=True,
+)
+def test_api_get_entries_with_data(client, created_entry):
+    """
+    Tests the GET /api/entries endpoint returns created entries.
+    """
     response = client.get("/api/entries")
     assert response.status_code == 200
 
@@ -154,21 +143,21 @@ def test_api_get_entries_with_data(mock_auth):
     assert len(entries) >= 1
 
     # Find our created entry
-    test_entry = next((e for e in entries if e["text"] == "Test dinner entry"), None)
-    assert test_entry is not None
-    assert test_entry["photo"] == "data:image/jpeg;base64,/9j/4AAQSkZJRgABAQEAYABgAAD/"
+    by_text = {e["text"]: e for e in entries}
+    assert created_entry["text"] in by_text
+    assert by_text[created_entry["text"]]["photo"] == created_entry["photo"]
 
 
-def test_api_delete_entry(mock_auth):
+@pytest.mark.parametrize(
+    "created_entry",
+    [{"timestamp": "2023-12-07T14:00:00Z", "text": "Entry to be deleted", "photo": None}],
+    indirect=True,
+)
+def test_api_delete_entry(client, created_entry):
     """
     Tests deleting an entry via DELETE /api/entries/{id}.
     """
-    # First create an entry
-    entry_data = {"timestamp": "2023-12-07T14:00:00Z", "text": "Entry to be deleted", "photo": None}
-
-    create_response = client.post("/api/entries", json=entry_data)
-    assert create_response.status_code == 201
-    entry_id = create_response.json()["id"]
+    entry_id = created_entry["id"]
 
     # Delete the entry
     delete_response = client.delete(f"/api/entries/{entry_id}")
@@ -176,12 +165,11 @@ def test_api_delete_entry(mock_auth):
 
     # Verify it's gone
     get_response = client.get("/api/entries")
-    entries = get_response.json()
-    deleted_entry = next((e for e in entries if e["id"] == entry_id), None)
-    assert deleted_entry is None
+    by_id = {e["id"]: e for e in get_response.json()}
+    assert entry_id not in by_id
 
 
-def test_api_delete_nonexistent_entry(mock_auth):
+def test_api_delete_nonexistent_entry(client, mock_auth):
     """
     Tests deleting a non-existent entry returns 404.
     """
@@ -190,7 +178,7 @@ def test_api_delete_nonexistent_entry(mock_auth):
     assert "not found" in response.json()["error"].lower()
 
 
-def test_homepage_contains_history_view():
+def test_homepage_contains_history_view(client):
     """
     Tests if the homepage contains the history view elements.
     """
@@ -198,13 +186,13 @@ def test_homepage_contains_history_view():
     assert response.status_code == 200
     # Check for history tab
     assert "History" in response.text
-    # Check for history container
-    assert "history-container" in response.text
+    # Check for history view heading
+    assert "Entry History" in response.text
     # Check for empty history message
     assert "No entries yet" in response.text
 
 
-def test_homepage_entry_template_structure():
+def test_homepage_entry_template_structure(client):
     """
     Tests if the homepage contains the correct Alpine.js template structure for entries.
     """
@@ -212,13 +200,13 @@ def test_homepage_entry_template_structure():
     assert response.status_code == 200
     # Check for Alpine.js entry template
     assert 'x-for="entry in entries"' in response.text
-    assert "entry-timestamp" in response.text
-    assert "entry-text" in response.text
-    assert "entry-photo" in response.text
-    assert "delete-button" in response.text
+    assert "formatTimestamp(entry.event_datetime)" in response.text
+    assert 'x-text="entry.text"' in response.text
+    assert ':src="entry.photo"' in response.text
+    assert "deleteEntry(entry.id)" in response.text
 
 
-def test_history_functionality_integration(mock_auth):
+def test_history_functionality_integration(client, mock_auth):
     """
     Integration test that creates entries via API and verifies they appear in history.
     This tests the full flow from API to frontend data binding.
@@ -234,11 +222,9 @@ def test_history_functionality_integration(mock_auth):
         {"timestamp": "2023-12-07T18:00:00Z", "text": "Dinner entry", "photo": None},
     ]
 
-    created_ids = []
-    for entry_data in entries_data:
-        response = client.post("/api/entries", json=entry_data)
-        assert response.status_code == 201
-        created_ids.append(response.json()["id"])
+    # Create all the entries in one request
+    response = client.post("/api/entries/bulk", json=entries_data)
+    assert response.status_code == 201
 
     # Verify entries can be retrieved
     response = client.get("/api/entries")
@@ -253,7 +239,7 @@ def test_history_functionality_integration(mock_auth):
     assert "Dinner entry" in texts
 
 
-def test_history_entry_deletion(mock_auth):
+def test_history_entry_deletion(client, mock_auth):
     """
     Tests that entries can be deleted and are removed from history.
     """
@@ -265,8 +251,8 @@ def test_history_entry_deletion(mock_auth):
 
     # Verify entry exists
     get_response = client.get("/api/entries")
-    entries = get_response.json()
-    assert any(e["id"] == entry_id for e in entries)
+    by_id = {e["id"]: e for e in get_response.json()}
+    assert entry_id in by_id
 
     # Delete the entry
     delete_response = client.delete(f"/api/entries/{entry_id}")
@@ -274,5 +260,5 @@ def test_history_entry_deletion(mock_auth):
 
     # Verify entry is gone from history
     get_response = client.get("/api/entries")
-    entries = get_response.json()
-    assert not any(e["id"] == entry_id for e in entries)
+    by_id = {e["id"]: e for e in get_response.json()}
+    assert entry_id not in by_id
@@ -0,0 +1,184 @@
+import json
+
+import pytest
+from fake_s3 import client_error, make_fake_storage
+
+from food_diary.s3_storage import USERS_MANIFEST_KEY
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """S3Storage backed by an in-memory bucket."""
+    return make_fake_storage(monkeypatch)
+
+
+def test_create_user_adds_user_to_manifest(storage):
+    """
+    Tests that a new user is written to the users manifest.
+    """
+    user = storage.create_or_update_user(github_id=111, username="first")
+
+    profiles, _ = storage._read_users_manifest()
+    assert profiles[111]["id"] == user["id"]
+    assert storage.get_user_by_github_id(111)["username"] == "first"
+
+
+def test_users_manifest_keeps_user_added_by_concurrent_login(storage, monkeypatch):
+    """
+    Tests that a manifest update retries, rather than overwriting a profile
+    another login added after the manifest was read.
+    """
+    storage.create_or_update_user(github_id=111, username="first")
+    real_put_object = storage.s3_client.put_object
+    raced = False
+
+    def put_object(**kwargs):
+        nonlocal raced
+        if kwargs["Key"] == USERS_MANIFEST_KEY and not raced:
+            # Another login adds its user between this one's read and write
+            raced = True
+            racer = {"id": 99, "github_id": 222, "username": "racer"}
+            objects = storage.s3_client.objects
+            objects[USERS_MANIFEST_KEY] += (json.dumps(racer) + "\n").encode("utf-8")
+        return real_put_object(**kwargs)
+
+    monkeypatch.setattr(storage.s3_client, "put_object", put_object)
+    storage.create_or_update_user(github_id=333, username="third")
+
+    profiles, _ = storage._read_users_manifest()
+    assert set(profiles) == {111, 222, 333}
+
+
+def test_get_user_by_github_id_scans_profiles_when_manifest_unreadable(storage, monkeypatch):
+    """
+    Tests that an S3 error reading the manifest falls back to scanning profiles.
+    """
+    storage.create_or_update_user(github_id=111, username="first")
+    real_get_object = storage.s3_client.get_object
+
+    def get_object(Bucket, Key):
+        if Key == USERS_MANIFEST_KEY:
+            raise client_error("AccessDenied", "GetObject")
+        return real_get_object(Bucket=Bucket, Key=Key)
+
+    monkeypatch.setattr(storage.s3_client, "get_object", get_object)
+
+    assert storage.get_user_by_github_id(111)["username"] == "first"
+
+
+def test_login_succeeds_when_manifest_cannot_be_written(storage, monkeypatch):
+    """
+    Tests that an S3 error writing the manifest doesn't fail creating a user.
+    """
+    real_put_object = storage.s3_client.put_object
+
+    def put_object(**kwargs):
+        if kwargs["Key"] == USERS_MANIFEST_KEY:
+            raise client_error("InternalError", "PutObject")
+        return real_put_object(**kwargs)
+
+    monkeypatch.setattr(storage.s3_client, "put_object", put_object)
+
+    user = storage.create_or_update_user(github_id=111, username="first")
+
+    assert storage.get_user_by_id(user["id"])["github_id"] == 111
+    assert storage.get_user_by_github_id(111)["id"] == user["id"]
+
+
+def test_get_user_by_github_id_uses_s3_select(storage, monkeypatch):
+    """
+    Tests that a user in the manifest is found with S3 Select, without scanning profiles.
+    """
+    user = storage.create_or_update_user(github_id=111, username="first")
+    storage.create_or_update_user(github_id=222, username="second")
+    storage.s3_client.select_supported = True
+
+    def list_objects_v2(**kwargs):
+        raise AssertionError("profiles should not be scanned")
+
+    monkeypatch.setattr(storage.s3_client, "list_objects_v2", list_objects_v2)
+
+    assert storage.get_user_by_github_id(111)["id"] == user["id"]
+
+
+def test_get_user_by_github_id_scans_profiles_when_s3_select_misses(storage):
+    """
+    Tests that a user missing from the manifest is still found by scanning profiles.
+    """
+    storage.create_or_update_user(github_id=111, username="first")
+    # A user created before the manifest existed only has a profile
+    legacy = {"id": 2, "github_id": 222, "username": "legacy"}
+    storage._write_json_to_s3(storage._get_user_profile_key(2), legacy)
+    storage.s3_client.select_supported = True
+
+    assert storage.get_user_by_github_id(222) == legacy
+    assert storage.get_user_by_github_id(333) is None
+
+
+def test_get_user_by_github_id_joins_records_split_across_events(storage):
+    """
+    Tests that an S3 Select record split across Records events, even mid-character,
+    is put back together before it is parsed.
+    """
+    user = storage.create_or_update_user(github_id=111, username="zoë", name="Zoë")
+    storage.s3_client.select_supported = True
+    storage.s3_client.select_chunk_size = 1
+
+    assert storage.get_user_by_github_id(111) == user
+
+
+def test_new_user_entries_start_at_id_one(storage):
+    """
+    Tests that a new user's entries file starts its counter at 1.
+    """
+    user = storage.create_or_update_user(github_id=111, username="first")
+
+    entries_data = storage._read_json_from_s3(storage._get_user_entries_key(user["id"]))
+    assert entries_data == {"next_id": 1, "entries": []}
+
+    entry = storage.create_entry(user["id"], timestamp="2023-12-07T08:00:00Z", text="Breakfast")
+    assert entry["id"] == 1
+
+
+def test_create_entries_assigns_consecutive_ids(storage):
+    """
+    Tests that a bulk create gives entries consecutive ids and advances the counter.
+    """
+    user = storage.create_or_update_user(github_id=111, username="first")
+    storage.create_entry(user["id"], timestamp="2023-12-07T08:00:00Z", text="Breakfast")
+
+    entries = storage.create_entries(
+        user["id"],
+        [
+            {"timestamp": "2023-12-07T10:00:00Z", "text": "Snack"},
+            {"timestamp": "2023-12-07T12:00:00Z", "text": "Lunch"},
+            {"timestamp": "2023-12-07T18:00:00Z", "text": "Dinner"},
+        ],
+    )
+
+    assert [entry["id"] for entry in entries] == [2, 3, 4]
+    entries_data = storage._read_json_from_s3(storage._get_user_entries_key(user["id"]))
+    assert entries_data["next_id"] == 5
+    assert len(entries_data["entries"]) == 4
+
+
+def test_legacy_entries_file_continues_from_highest_id(storage):
+    """
+    Tests that an entries file written before the counter existed continues from max(id) + 1.
+    """
+    entries_key = storage._get_user_entries_key(1)
+    storage._write_json_to_s3(
+        entries_key,
+        {"entries": [{"id": 3, "user_id": 1}, {"id": 7, "user_id": 1}, {"id": 5, "user_id": 1}]},
+    )
+
+    entries = storage.create_entries(
+        1,
+        [
+            {"timestamp": "2023-12-07T08:00:00Z", "text": "Breakfast"},
+            {"timestamp": "2023-12-07T12:00:00Z", "text": "Lunch"},
+        ],
+    )
+
+    assert [entry["id"] for entry in entries] == [8, 9]
+    assert storage._read_json_from_s3(entries_key)["next_id"] == 10